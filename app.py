@@ -2,12 +2,16 @@ from flask import Flask, jsonify, send_from_directory, url_for
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+import logging
 import sqlite3
 import os
 from datetime import datetime
 from scraper import scrape_ship_location
 from scheduler import start_scheduler
 
+# Scraper diagnostics are logged at DEBUG; set LOG_LEVEL=DEBUG to see them
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper())
+
 app = Flask(__name__, static_folder='static', static_url_path='/static')
 CORS(app)
 
@@ -46,6 +50,14 @@ def init_db():
     except sqlite3.OperationalError:
         # Column already exists, ignore
         pass
+    # Index the latest-location and history lookups (filter by ship, newest first) so
+    # they stay an index seek instead of a full sort as the table grows
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_ship_locations_ship_timestamp
+        ON ship_locations (ship_name, timestamp)
+    ''')
+    # WAL lets API reads proceed while the scheduler is writing a new location
+    c.execute('PRAGMA journal_mode=WAL')
     conn.commit()
     conn.close()
 
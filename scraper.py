@@ -1,25 +1,490 @@
+import json
+import logging
+import os
+import threading
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Comment
 import re
+from functools import lru_cache
 from geopy.geocoders import Nominatim
+from geopy.adapters import RequestsAdapter
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
-import time
+from geopy.extra.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# ETag/Last-Modified of the last vessel page that was parsed, with its result, keyed by
+# URL; sent back as a conditional GET so an unchanged page comes back as 304 Not Modified
+_last_page = {}
+
+def _create_http_clients():
+    """
+    Create the HTTP clients shared by every scrape in this process: a session so the
+    shipnext.com connection (TCP + TLS) is kept alive between scheduled scrapes, and a
+    geocoder client so its connection pool is reused between lookups
+    """
+    global _session, _geolocator, _geocode
+    _session = requests.Session()
+    _session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    })
+    _geolocator = Nominatim(user_agent="ship_tracker", timeout=10, adapter_factory=RequestsAdapter)
+    # Nominatim usage policy allows at most one request per second
+    # No retries: geocoding runs inside /api/update, and retried timeouts (plus the wait
+    # between tries) would outlast gunicorn's 30 second worker timeout; failed lookups
+    # aren't cached, so they are retried on the next update anyway
+    _geocode = RateLimiter(_geolocator.geocode, min_delay_seconds=1, max_retries=0, swallow_exceptions=False)
+
+_create_http_clients()
+# Gunicorn preloads the app and runs the first scrape in the master before forking, so
+# each worker builds its own clients instead of sharing the master's pooled keep-alive
+# sockets (two workers writing to one TLS connection corrupt it)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_create_http_clients)
+
+# Successful geocoding results persisted between runs, keyed by normalized location text
+_GEOCODE_CACHE_PATH = 'geocode_cache.json'
+_geocode_cache = None
+_geocode_cache_lock = threading.Lock()
+
+def _reset_geocode_cache_lock():
+    """
+    Give a forked worker its own lock: the scheduler thread in the gunicorn master may be
+    saving a result (holding the lock) when a worker is forked, and the copy inherited by
+    the worker would never be released
+    """
+    global _geocode_cache_lock
+    _geocode_cache_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_geocode_cache_lock)
+
+# DMS latitude/longitude pair separated by a slash or comma, compiled once so the
+# slash and comma forms are matched in a single scan
+_DMS_PAIR_RE = re.compile(
+    r'(\d+)[°\s]+(\d+)[\'\s]+(\d+(?:\.\d+)?)["]?\s*([NS])'
+    r'(?:\s*/\s*|[,\s]+)'
+    r'(\d+)[°\s]+(\d+)[\'\s]+(\d+(?:\.\d+)?)["]?\s*([EW])',
+    re.I
+)
+
+# Single DMS value, tried in order: 40°42'46"N or 40°42'46.5"N, then 40 deg 42 min 46 sec N
+_DMS_VALUE_PATTERNS = (
+    re.compile(r'(\d+)[°\s]+(\d+)[\'\s]+(\d+(?:\.\d+)?)[\"\s]*([NSEW])', re.I),
+    re.compile(r'(\d+)\s*(?:deg|degree|°)\s+(\d+)\s*(?:min|minute|\')\s+(\d+(?:\.\d+)?)\s*(?:sec|second|\")?\s*([NSEW])', re.I),
+)
+
+# Labelled DMS latitude/longitude, falling back to any DMS value in the right hemisphere
+_DMS_LAT_PATTERNS = (
+    r'Lat[itude]*[:]?\s*(\d+[°\s]+\d+[\'\s]+\d+(?:\.\d+)?[\"]?\s*[NS])',
+    r'(\d+[°\s]+\d+[\'\s]+\d+(?:\.\d+)?[\"]?\s*[NS])',
+)
+_DMS_LON_PATTERNS = (
+    r'Lon[gitude]*[:]?\s*(\d+[°\s]+\d+[\'\s]+\d+(?:\.\d+)?[\"]?\s*[EW])',
+    r'(\d+[°\s]+\d+[\'\s]+\d+(?:\.\d+)?[\"]?\s*[EW])',
+)
+
+# Coordinates following "Vessel's current position is", as a DMS pair separated by a
+# slash or comma, or as decimal degrees
+_POSITION_PATTERNS = (
+    re.compile(r"Vessel'?s\s+current\s+position\s+is\s+(\d+[°\s]+\d+['\s]+\d+(?:\.\d+)?[\"]?\s*[NS])\s*/\s*(\d+[°\s]+\d+['\s]+\d+(?:\.\d+)?[\"]?\s*[EW])", re.I),
+    re.compile(r"Vessel'?s\s+current\s+position\s+is\s+(\d+[°\s]+\d+['\s]+\d+(?:\.\d+)?[\"]?\s*[NS]),\s*(\d+[°\s]+\d+['\s]+\d+(?:\.\d+)?[\"]?\s*[EW])", re.I),
+    re.compile(r"Vessel'?s\s+current\s+position\s+is\s*[:\-]?\s*(-?\d+\.?\d*)\s*[,/\s]+\s*(-?\d+\.?\d*)", re.I),
+)
+
+# Body of each <script> element in raw HTML
+_SCRIPT_BODY_RE = re.compile(r'<script\b[^>]*>(.*?)</script\s*>', re.I | re.S)
+
+# Decimal degree pair such as "40.123, -74.456" or "40.123: -74.456"
+_DECIMAL_PAIR_RE = re.compile(r'(-?\d+\.?\d*)\s*[,:]\s*(-?\d+\.?\d*)')
+
+# Destination keys in JSON/JavaScript blobs embedded in script tags, e.g.
+# "destination": "Iquique", in order of preference
+_JS_DESTINATION_PATTERNS = (
+    r'["\']destination["\']\s*:\s*["\']([^"\']+)["\']',
+    r'["\']port["\']\s*:\s*["\']([^"\']+)["\']',
+    r'["\']nextPort["\']\s*:\s*["\']([^"\']+)["\']',
+    r'["\']destinationPort["\']\s*:\s*["\']([^"\']+)["\']',
+    r'destination["\']?\s*:\s*["\']([^"\']+)["\']',
+)
+
+# Latitude/longitude assignments in JavaScript, e.g. lat: 12.3 or "longitude"=45.6
+_JS_LATLNG_RE = re.compile(
+    r'(?P<axis>lat[itude]*|lng|lon[gitude]*)["\']?\s*[:=]\s*(?P<value>-?\d+\.?\d*)',
+    re.I
+)
+
+# CSS selectors for destination elements, in order of preference: elements whose class
+# names hint at a destination, then elements carrying each destination data attribute
+# (one selector list would return all of them in document order instead)
+_DESTINATION_SELECTORS = (
+    ', '.join(f'{tag}[class*="{keyword}" i]'
+              for tag in ('div', 'span', 'td', 'dd', 'p')
+              for keyword in ('destination', 'port', 'location', 'to', 'next')),
+    '[data-destination]',
+    '[data-port]',
+    '[data-location]',
+)
+
+# Leading words of button/navigation labels that are never a destination
+_SKIP_PREFIXES = ('show', 'click', 'view', 'see', 'more', 'less', 'add', 'edit', 'delete',
+                  'submit', 'cancel', 'close', 'open', 'menu', 'nav', 'link')
+
+# Generic labels that are never a destination when found in an HTML element
+_ELEMENT_SKIP_RE = re.compile('|'.join((
+    r'(button|link|menu|nav|tab|icon|arrow|chevron)',
+    r'(trading desk|position|add position|manage)',
+    r'^(vessel|ship|boat).*status$',
+    r'status$',
+    r'latest.*AIS.*Satellite.*data',
+    r'AIS.*Satellite.*data',
+    r'Satellite.*AIS.*data',
+    r'latest.*data',
+    r'real.*time.*data',
+    r'tracking.*data',
+)), re.I)
+
+# Trailing words that mark UI text rather than a place name
+_NON_PLACE_SUFFIX_RE = re.compile(r'(data|status|info|details|more|click|here)$')
+
+# Keywords in a (lowercased) table row label marking a destination or origin value
+_TABLE_DESTINATION_LABEL_RE = re.compile(r'destination|port|to|location')
+_TABLE_ORIGIN_LABEL_RE = re.compile(r'origin|from|last port|previous port|departed')
+
+# Text patterns for the destination port, in order of preference
+# Captures are bounded at 300 characters, well past any sentence clause that names a port,
+# so lazy matches can't backtrack across hundreds of KB of unpunctuated page text; long
+# clauses still match, since clean_place_text cuts them down to their first two
+# comma-separated parts before is_valid_place checks the length
+_DESTINATION_PATTERNS = (
+    r'on route to\s+([^\n\r.]{1,300}?)(?:\.|Estimated)',  # "on route to Iquique, Chile."
+    r'route to\s+([^\n\r.]{1,300}?)(?:\.|Estimated)',  # "route to Iquique, Chile."
+    r'to\s+([A-Z][a-zA-Z\s,]{1,300}?)(?:\.|Estimated)',  # "to Iquique, Chile."
+    r'from\s+[^\.]{1,300}?\s+to\s+([^\n\r.]{1,300}?)(?:\.|$)',  # "from X to Iquique, Chile."
+    r'Destination[:\s]+([^\n\r]{1,300})',
+    r'Port[:\s]+([^\n\r]{1,300})',
+    r'Heading[:\s]+to[:\s]+([^\n\r]{1,300})',
+    r'Next Port[:\s]+([^\n\r]{1,300})',
+    r'Next Port of Call[:\s]+([^\n\r]{1,300})',
+    r'Destination Port[:\s]+([^\n\r]{1,300})',
+    r'Going to[:\s]+([^\n\r]{1,300})',
+    r'Bound for[:\s]+([^\n\r]{1,300})',
+    r'Current Port[:\s]+([^\n\r]{1,300})',
+    r'Location[:\s]+([^\n\r]{1,300})',
+    r'At[:\s]+([^\n\r]{1,300})',  # "At: Port Name"
+)
+
+# Destination patterns for the search results page, in order of preference
+_SEARCH_DESTINATION_PATTERNS = (
+    r'on route to\s+([^\n\r.]+?)(?:\.|Estimated)',  # "on route to City, Country."
+    r'route to\s+([^\n\r.]+?)(?:\.|Estimated)',  # "route to City, Country."
+    r'to\s+([A-Z][a-zA-Z\s,]+?)(?:\.|Estimated)',  # "to City, Country."
+    r'Destination[:\s]+([^\n]+)',
+    r'Port[:\s]+([^\n]+)',
+    r'Heading[:\s]+to[:\s]+([^\n]+)',
+    r'ETA[:\s]+([^\n]+)',
+)
+
+# Text patterns for the origin port (city the ship is proceeding from), in order of preference
+_ORIGIN_PATTERNS = (
+    r'from\s+([^\n\r.]{1,300}?)\s+to\s+',  # "from X to Y" - extract X
+    r'proceeding\s+from\s+([^\n\r.]{1,300}?)(?:\s+to|\s*\.|$)',  # "proceeding from X to Y" or "proceeding from X."
+    r'departed\s+from\s+([^\n\r.]{1,300}?)(?:\s+to|\s*\.|$)',  # "departed from X"
+    r'Origin[:\s]+([^\n\r]{1,300})',  # "Origin: X"
+    r'From Port[:\s]+([^\n\r]{1,300})',  # "From Port: X"
+    r'Last Port[:\s]+([^\n\r]{1,300})',  # "Last Port: X"
+    r'Previous Port[:\s]+([^\n\r]{1,300})',  # "Previous Port: X"
+    r'Port of Origin[:\s]+([^\n\r]{1,300})',  # "Port of Origin: X"
+)
+
+# Leading words stripped from matched destination/origin text
+_DESTINATION_PREFIX_RE = re.compile(r'^(port|to|at|in|for)\s+', re.I)
+_ORIGIN_PREFIX_RE = re.compile(r'^(port|from|at|in|for)\s+', re.I)
+
+# Generic metadata/advertising phrases that are never a place name
+_SKIP_PHRASES = (
+    r'latest.*AIS.*Satellite.*data',
+    r'AIS.*Satellite.*data',
+    r'Satellite.*AIS.*data',
+    r'latest.*data',
+    r'real.*time.*data',
+    r'tracking.*data',
+    r'vessel.*status',
+    r'ship.*status',
+    r'position.*data',
+    r'location.*data',
+    r'click.*here',
+    r'show.*more',
+    r'view.*details',
+    r'see.*more',
+)
+
+# Each phrase is a run of words that must appear in order, so a plain substring scan
+# rules out almost every candidate before the combined alternation has to run
+_SKIP_TOKEN_SEQUENCES = tuple(tuple(p.lower().split('.*')) for p in _SKIP_PHRASES)
+_SKIP_PHRASES_RE = re.compile('|'.join(_SKIP_PHRASES), re.I)
+
+# Guards for candidate place names: dates, bare coordinates, and a minimum run of letters
+_DATE_RE = re.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}')
+_COORD_RE = re.compile(r'^-?\d+\.?\d*[,\s]+-?\d+\.?\d*$')
+_HAS_LETTERS_RE = re.compile(r'[a-zA-Z]{3,}')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Destination values that sites show when no port is known; never worth geocoding
+_NON_PLACE_VALUES = frozenset((
+    'n/a', 'na', 'none', 'null', 'unknown', 'not available', 'underway', 'under way',
+    'at sea', 'at anchor', 'anchored', 'moored', 'for orders', 'tba', 'tbd', 'tbc',
+))
+
+# Page chrome that never carries vessel details: inline SVG icons/map labels and
+# dropdown option lists (flags, ports, countries)
+_NON_CONTENT_TAGS = ('svg', 'select')
+
+def compile_pattern_set(patterns):
+    """
+    Combine single-group patterns into one regex that is scanned once.
+    Each alternative sits inside a lookahead, so every position of the text is tried
+    and match.lastindex identifies which pattern matched there.
+    Returns (lowercase, caseless), each a (combined_re, pattern_res) pair: lowercase is
+    matched case-sensitively against text that was lowercased once up front, which
+    avoids per-character case folding; caseless is the re.I fallback. pattern_res holds
+    the patterns compiled one by one, to check the lower-priority patterns that start
+    where the combined regex reported a higher-priority one. Patterns must not use
+    uppercase escapes such as \\S or \\D, since they are lowercased here.
+    """
+    combined = '(?=' + '|'.join(f'(?:{p})' for p in patterns) + ')'
+    lowercase = (re.compile(combined.lower()), tuple(re.compile(p.lower()) for p in patterns))
+    caseless = (re.compile(combined, re.I), tuple(re.compile(p, re.I) for p in patterns))
+    return lowercase, caseless
+
+_DESTINATION_SCAN_RE = compile_pattern_set(_DESTINATION_PATTERNS)
+_ORIGIN_SCAN_RE = compile_pattern_set(_ORIGIN_PATTERNS)
+_SEARCH_DESTINATION_SCAN_RE = compile_pattern_set(_SEARCH_DESTINATION_PATTERNS)
+_DMS_LAT_SCAN_RE = compile_pattern_set(_DMS_LAT_PATTERNS)
+_DMS_LON_SCAN_RE = compile_pattern_set(_DMS_LON_PATTERNS)
+_JS_DESTINATION_SCAN_RE = compile_pattern_set(_JS_DESTINATION_PATTERNS)
+
+def find_first_valid(pattern_set, text, accept, text_lower=None):
+    """
+    Scan text once with a combined pattern set and return accept(captured text) for the
+    highest-priority pattern whose first match accept() doesn't reject with None.
+    Same result as trying each pattern in order with its own search, moving on to the
+    next pattern when accept() rejects the first match.
+    Pass text_lower when the caller already has text.lower() to avoid recomputing it.
+    """
+    lowercase, caseless = pattern_set
+    if text_lower is None:
+        text_lower = text.lower()
+    if len(text_lower) == len(text):
+        (combined_re, pattern_res), scan_text = lowercase, text_lower
+    else:
+        # A few non-ASCII characters change length when lowercased, which would shift
+        # match offsets, so fall back to matching the original text caselessly
+        (combined_re, pattern_res), scan_text = caseless, text
+    
+    tried = set()
+    best_index = len(pattern_res) + 1
+    best_value = None
+    for match in combined_re.finditer(scan_text):
+        index = match.lastindex
+        # Lower priorities can't win
+        if index >= best_index:
+            continue
+        position = match.start()
+        # The combined regex only reports the highest-priority pattern at a position, so
+        # lower-priority patterns starting here are matched on their own; only the first
+        # match of each pattern counts
+        for i in range(index, best_index):
+            if i in tried:
+                continue
+            if i == index:
+                start, end = match.span(index)
+            else:
+                own_match = pattern_res[i - 1].match(scan_text, position)
+                if not own_match:
+                    continue
+                start, end = own_match.span(1)
+            tried.add(i)
+            # Slice the original text so the value keeps its capitalisation
+            value = accept(text[start:end])
+            if value is not None:
+                best_index = i
+                best_value = value
+                break
+        # Done once every higher-priority pattern has had its chance
+        if all(i in tried for i in range(1, best_index)):
+            break
+    
+    return best_value
+
+def find_first_match(pattern_set, text, text_lower=None):
+    """
+    Return the captured text of the highest-priority pattern that matches anywhere in
+    text, or None. Same result as trying each pattern in order with its own search.
+    """
+    return find_first_valid(pattern_set, text, lambda captured: captured, text_lower)
+
+def is_numeric_text(text):
+    """Check if text is made up only of digits and coordinate separators"""
+    stripped = text.replace(' ', '').replace(',', '').replace('.', '').replace('-', '')
+    return stripped.isdigit()
+
+def starts_numeric(text):
+    """Check if text starts with a digit or minus sign, as dates and coordinates do"""
+    first = text[:1]
+    return first.isdigit() or first == '-'
+
+def is_skip_phrase(text):
+    """Check if text is a generic metadata/advertising phrase rather than a place name"""
+    text_lower = text.lower()
+    for tokens in _SKIP_TOKEN_SEQUENCES:
+        pos = 0
+        for token in tokens:
+            pos = text_lower.find(token, pos)
+            if pos < 0:
+                break
+            pos += len(token)
+        else:
+            # Confirm with the regex, which also rejects words split across lines
+            return _SKIP_PHRASES_RE.search(text_lower) is not None
+    return False
+
+def is_valid_place(text):
+    """
+    Check if candidate destination/origin text looks like a place name
+    Rejects text that is too short or long, a date, bare coordinates,
+    has no run of letters, or is a generic metadata phrase
+    """
+    if len(text) <= 2 or len(text) >= 100:
+        return False
+    # Dates and coordinates both start with a digit or a minus sign
+    if starts_numeric(text) and (_DATE_RE.match(text) or _COORD_RE.match(text)):
+        return False
+    # Must have letters (place name)
+    if not _HAS_LETTERS_RE.search(text):
+        return False
+    if is_skip_phrase(text):
+        logger.debug("Skipping generic phrase: %s", text)
+        return False
+    return True
+
+def clean_place_text(text, prefix_re):
+    """Normalize matched destination/origin text to a single 'City, Country' line"""
+    text = _WHITESPACE_RE.sub(' ', text.strip())
+    # Remove common prefixes/suffixes
+    text = prefix_re.sub('', text)
+    # Keep both city and country (typically separated by comma)
+    # Take the first two comma-separated parts (city, country)
+    city, sep, rest = text.partition(',')
+    text = f"{city.strip()}, {rest.partition(',')[0].strip()}" if sep else city.strip()
+    # First line only, and the first port of "Port A / Port B"
+    return text.partition('\n')[0].partition('/')[0].strip()
+
+def find_place_text(pattern_set, text, prefix_re, text_lower=None):
+    """
+    Scan text once with a combined pattern set and return the cleaned place name from
+    the highest-priority pattern whose first match is valid, or None.
+    Mirrors trying each pattern in order with its own search, without rescanning the text.
+    Pass text_lower when the caller already has text.lower() to avoid recomputing it.
+    """
+    def accept(captured):
+        candidate = clean_place_text(captured, prefix_re)
+        return candidate if is_valid_place(candidate) else None
+    
+    return find_first_valid(pattern_set, text, accept, text_lower)
+
+def read_geocode_cache_file():
+    """Read the on-disk geocoding cache, returning an empty cache if it is missing or unreadable"""
+    try:
+        with open(_GEOCODE_CACHE_PATH, 'r', encoding='utf-8') as f:
+            return {key: tuple(value) for key, value in json.load(f).items()}
+    except (OSError, ValueError, TypeError, AttributeError):
+        return {}
+
+def load_geocode_cache():
+    """Load the on-disk geocoding cache once, returning an empty cache if it is missing or unreadable"""
+    global _geocode_cache
+    if _geocode_cache is None:
+        _geocode_cache = read_geocode_cache_file()
+    return _geocode_cache
+
+def save_geocode_result(location_key, coordinates):
+    """Add a geocoding result to the on-disk cache"""
+    with _geocode_cache_lock:
+        cache = load_geocode_cache()
+        # Other gunicorn workers may have saved places since this process loaded the file,
+        # so merge those in instead of overwriting them with this process's copy
+        for key, value in read_geocode_cache_file().items():
+            cache.setdefault(key, value)
+        cache[location_key] = coordinates
+        # Write to a per-process temporary file first so a crash never leaves a
+        # truncated cache and gunicorn workers saving at once don't share a file
+        tmp_path = f'{_GEOCODE_CACHE_PATH}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, _GEOCODE_CACHE_PATH)
+        except OSError as e:
+            print(f"Could not save geocode cache: {e}")
+            # Don't leave a partly written temporary file behind
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+def looks_like_place(location_key):
+    """Cheap check that normalized location text could name a place before paying for a geocoding request"""
+    return len(location_key) >= 3 and \
+        _HAS_LETTERS_RE.search(location_key) is not None and \
+        location_key not in _NON_PLACE_VALUES
+
+def _geocode_cached(location_key):
+    """
+    Geocode a normalized location, remembering places that were found for repeated lookups
+    Only hits are cached (in memory and on disk); a place Nominatim didn't find is looked
+    up again next time rather than remembered as a miss for the life of the process
+    """
+    # A hit in the in-memory copy of the on-disk cache skips the rate-limit delay and the
+    # Nominatim request
+    with _geocode_cache_lock:
+        cached = load_geocode_cache().get(location_key)
+    if cached:
+        return cached
+    
+    # Geocoder errors propagate, so failed lookups are not cached and get retried later
+    location = _geocode(location_key)
+    if location:
+        coordinates = (location.latitude, location.longitude)
+        # Only places that were found are persisted; misses are retried on the next run
+        save_geocode_result(location_key, coordinates)
+        return coordinates
+    return None, None
 
 def geocode_location(location_text):
     """Convert location text to coordinates"""
     if not location_text:
         return None, None
     
-    geolocator = Nominatim(user_agent="ship_tracker")
+    # Case and whitespace differences don't change the place, so they share a cache entry
+    location_key = _WHITESPACE_RE.sub(' ', location_text).strip().lower()
+    if not looks_like_place(location_key):
+        logger.debug("Not geocoding non-place text: %s", location_text)
+        return None, None
+    
     try:
-        time.sleep(1)  # Rate limiting
-        location = geolocator.geocode(location_text, timeout=10)
-        if location:
-            return location.latitude, location.longitude
+        return _geocode_cached(location_key)
     except (GeocoderTimedOut, GeocoderServiceError) as e:
         print(f"Geocoding error: {e}")
     return None, None
 
+def dms_to_decimal(degrees, minutes, seconds, hemisphere):
+    """Convert degrees, minutes, seconds and an uppercase hemisphere letter to signed decimal degrees"""
+    decimal = degrees + (minutes / 60.0) + (seconds / 3600.0)
+    # Apply hemisphere (negative for S and W)
+    if hemisphere in ('S', 'W'):
+        decimal = -decimal
+    return decimal
+
 def parse_dms_to_decimal(dms_str):
     """
     Parse degrees, minutes, seconds format to decimal degrees
@@ -33,19 +498,14 @@ def parse_dms_to_decimal(dms_str):
     if not dms_str:
         return None
     
-    # Pattern for DMS format: degrees?minutes'seconds"hemisphere
-    # Supports various separators and formats
-    patterns = [
-        # Standard format: 40°42'46"N or 40° 42' 46" N
-        r'(\d+)[°\s]+(\d+)[\'\s]+(\d+(?:\.\d+)?)[\"\s]*([NSEW])',
-        # Alternative format: 40 deg 42 min 46 sec N
-        r'(\d+)\s*(?:deg|degree|°)\s+(\d+)\s*(?:min|minute|\')\s+(\d+(?:\.\d+)?)\s*(?:sec|second|\")?\s*([NSEW])',
-        # With decimal seconds: 40°42'46.5"N
-        r'(\d+)[°\s]+(\d+)[\'\s]+(\d+\.\d+)[\"\s]*([NSEW])',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, dms_str, re.I)
+    # Every supported format needs a digit and a hemisphere letter; skip the regex
+    # passes entirely when either is missing
+    if not any(c in 'NSEWnsew' for c in dms_str) or not any(c.isdigit() for c in dms_str):
+        return None
+    
+    # Supports various separators and formats (see _DMS_VALUE_PATTERNS)
+    for pattern in _DMS_VALUE_PATTERNS:
+        match = pattern.search(dms_str)
         if match:
             try:
                 degrees = int(match.group(1))
@@ -53,14 +513,7 @@ def parse_dms_to_decimal(dms_str):
                 seconds = float(match.group(3))
                 hemisphere = match.group(4).upper()
                 
-                # Convert to decimal degrees
-                decimal = degrees + (minutes / 60.0) + (seconds / 3600.0)
-                
-                # Apply hemisphere (negative for S and W)
-                if hemisphere in ['S', 'W']:
-                    decimal = -decimal
-                
-                return decimal, hemisphere
+                return dms_to_decimal(degrees, minutes, seconds, hemisphere), hemisphere
             except (ValueError, IndexError):
                 continue
     
@@ -75,95 +528,53 @@ def extract_dms_coordinates_from_text(text):
         return None, None
     
     # Look for latitude patterns (N/S)
-    lat_patterns = [
-        r'Lat[itude]*[:]?\s*(\d+[°\s]+\d+[\'\s]+\d+(?:\.\d+)?[\"]?\s*[NS])',
-        r'(\d+[°\s]+\d+[\'\s]+\d+(?:\.\d+)?[\"]?\s*[NS])',
-    ]
-    
-    lat_dms = None
-    for pattern in lat_patterns:
-        match = re.search(pattern, text, re.I)
-        if match:
-            lat_dms = match.group(1)
-            break
+    # Both lookups share one lowercased copy of the text
+    text_lower = text.lower()
+    lat_dms = find_first_match(_DMS_LAT_SCAN_RE, text, text_lower)
+    
+    # The pair pattern below is a latitude followed by a longitude in these same
+    # forms, so it can't match unless both lookups find something
+    if not lat_dms:
+        return None, None
     
     # Look for longitude patterns (E/W)
-    lon_patterns = [
-        r'Lon[gitude]*[:]?\s*(\d+[°\s]+\d+[\'\s]+\d+(?:\.\d+)?[\"]?\s*[EW])',
-        r'(\d+[°\s]+\d+[\'\s]+\d+(?:\.\d+)?[\"]?\s*[EW])',
-    ]
-    
-    lon_dms = None
-    for pattern in lon_patterns:
-        match = re.search(pattern, text, re.I)
-        if match:
-            lon_dms = match.group(1)
-            break
+    lon_dms = find_first_match(_DMS_LON_SCAN_RE, text, text_lower)
+    if not lon_dms:
+        return None, None
     
-    # If we found both, try to parse them
-    if lat_dms and lon_dms:
-        lat_result = parse_dms_to_decimal(lat_dms)
-        lon_result = parse_dms_to_decimal(lon_dms)
-        
-        if lat_result and lon_result:
-            lat, _ = lat_result
-            lon, _ = lon_result
-            # Validate reasonable coordinates
-            if -90 <= lat <= 90 and -180 <= lon <= 180:
-                print(f"[DEBUG] Found coordinates from DMS lat/lon patterns: Latitude={lat}, Longitude={lon}")
-                return lat, lon
+    # Both were found, try to parse them
+    lat_result = parse_dms_to_decimal(lat_dms)
+    lon_result = parse_dms_to_decimal(lon_dms)
     
-    # Try to find DMS coordinates in pairs with forward slash separator
-    # Pattern: 051° 18' 06" N / 003° 14' 14" E
-    slash_pattern = r'(\d+)[°\s]+(\d+)[\'\s]+(\d+(?:\.\d+)?)[\"]?\s*([NS])\s*/\s*(\d+)[°\s]+(\d+)[\'\s]+(\d+(?:\.\d+)?)[\"]?\s*([EW])'
-    slash_match = re.search(slash_pattern, text, re.I)
-    if slash_match:
+    if lat_result and lon_result:
+        lat, _ = lat_result
+        lon, _ = lon_result
+        # Validate reasonable coordinates
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            logger.debug("Found coordinates from DMS lat/lon patterns: Latitude=%s, Longitude=%s", lat, lon)
+            return lat, lon
+    
+    # Try to find DMS coordinates in pairs, separated by a forward slash or comma
+    # Patterns: 051° 18' 06" N / 003° 14' 14" E or 40°42'46"N, 74°00'21"W
+    pair_match = _DMS_PAIR_RE.search(text)
+    if pair_match:
         try:
-            lat_deg = int(slash_match.group(1))
-            lat_min = int(slash_match.group(2))
-            lat_sec = float(slash_match.group(3))
-            lat_hem = slash_match.group(4).upper()
-            
-            lon_deg = int(slash_match.group(5))
-            lon_min = int(slash_match.group(6))
-            lon_sec = float(slash_match.group(7))
-            lon_hem = slash_match.group(8).upper()
-            
-            # Convert to decimal degrees
-            lat = lat_deg + (lat_min / 60.0) + (lat_sec / 3600.0)
-            lon = lon_deg + (lon_min / 60.0) + (lon_sec / 3600.0)
-            
-            # Apply hemisphere (negative for S and W)
-            if lat_hem == 'S':
-                lat = -lat
-            if lon_hem == 'W':
-                lon = -lon
+            lat = dms_to_decimal(int(pair_match.group(1)), int(pair_match.group(2)),
+                                 float(pair_match.group(3)), pair_match.group(4).upper())
+            lon = dms_to_decimal(int(pair_match.group(5)), int(pair_match.group(6)),
+                                 float(pair_match.group(7)), pair_match.group(8).upper())
             
             if -90 <= lat <= 90 and -180 <= lon <= 180:
-                print(f"[DEBUG] Found coordinates from slash pattern: Latitude={lat}, Longitude={lon}")
+                logger.debug("Found coordinates from pair pattern: Latitude=%s, Longitude=%s", lat, lon)
                 return lat, lon
         except (ValueError, IndexError):
             pass
     
-    # Try to find DMS coordinates in pairs (common format: lat, lon)
-    # Pattern: 40°42'46"N, 74°00'21"W or similar
-    pair_pattern = r'(\d+[°\s]+\d+[\'\s]+\d+(?:\.\d+)?[\"]?\s*[NS])[,\s]+(\d+[°\s]+\d+[\'\s]+\d+(?:\.\d+)?[\"]?\s*[EW])'
-    pair_match = re.search(pair_pattern, text, re.I)
-    if pair_match:
-        lat_dms = pair_match.group(1)
-        lon_dms = pair_match.group(2)
-        lat_result = parse_dms_to_decimal(lat_dms)
-        lon_result = parse_dms_to_decimal(lon_dms)
-        
-        if lat_result and lon_result:
-            lat, _ = lat_result
-            lon, _ = lon_result
-            if -90 <= lat <= 90 and -180 <= lon <= 180:
-                print(f"[DEBUG] Found coordinates from pair pattern: Latitude={lat}, Longitude={lon}")
-                return lat, lon
-    
     return None, None
 
+# The vessel page rarely changes between polls, so the last poll's page and residual
+# texts are remembered and an unchanged page skips the coordinate regex passes
+@lru_cache(maxsize=4)
 def extract_coordinates_after_position_string(text):
     """
     Extract coordinates that appear after "Vessel's current position is"
@@ -174,18 +585,8 @@ def extract_coordinates_after_position_string(text):
     
     # Look for the pattern "Vessel's current position is" followed by coordinates
     # Try various formats that might follow this string (case-insensitive, handles variations)
-    position_patterns = [
-        # Pattern: "Vessel's current position is" followed by DMS format with slash
-        # e.g., "Vessel's current position is 051° 18' 06" N / 003° 14' 14" E"
-        r"Vessel'?s\s+current\s+position\s+is\s+(\d+[°\s]+\d+['\s]+\d+(?:\.\d+)?[\"]?\s*[NS])\s*/\s*(\d+[°\s]+\d+['\s]+\d+(?:\.\d+)?[\"]?\s*[EW])",
-        # Pattern: "Vessel's current position is" followed by DMS format with comma
-        r"Vessel'?s\s+current\s+position\s+is\s+(\d+[°\s]+\d+['\s]+\d+(?:\.\d+)?[\"]?\s*[NS]),\s*(\d+[°\s]+\d+['\s]+\d+(?:\.\d+)?[\"]?\s*[EW])",
-        # Pattern: "Vessel's current position is" followed by decimal degrees
-        r"Vessel'?s\s+current\s+position\s+is\s*[:\-]?\s*(-?\d+\.?\d*)\s*[,/\s]+\s*(-?\d+\.?\d*)",
-    ]
-    
-    for pattern in position_patterns:
-        match = re.search(pattern, text, re.I)
+    for pattern in _POSITION_PATTERNS:
+        match = pattern.search(text)
         if match:
             # Try to extract as DMS first
             if len(match.groups()) == 2:
@@ -201,7 +602,7 @@ def extract_coordinates_after_position_string(text):
                         lat, _ = lat_result
                         lon, _ = lon_result
                         if -90 <= lat <= 90 and -180 <= lon <= 180:
-                            print(f"[DEBUG] Found coordinates after 'Vessel's current position is' (DMS): Latitude={lat}, Longitude={lon}")
+                            logger.debug("Found coordinates after 'Vessel's current position is' (DMS): Latitude=%s, Longitude=%s", lat, lon)
                             return lat, lon
                 else:
                     # Try as decimal degrees
@@ -209,13 +610,14 @@ def extract_coordinates_after_position_string(text):
                         lat = float(lat_str)
                         lon = float(lon_str)
                         if -90 <= lat <= 90 and -180 <= lon <= 180:
-                            print(f"[DEBUG] Found coordinates after 'Vessel's current position is' (decimal): Latitude={lat}, Longitude={lon}")
+                            logger.debug("Found coordinates after 'Vessel's current position is' (decimal): Latitude=%s, Longitude=%s", lat, lon)
                             return lat, lon
                     except ValueError:
                         continue
     
     return None, None
 
+@lru_cache(maxsize=4)
 def extract_coordinates_from_text(text):
     """
     Try to extract coordinates from text
@@ -227,21 +629,21 @@ def extract_coordinates_from_text(text):
     # First try DMS format (degrees, minutes, seconds)
     lat, lon = extract_dms_coordinates_from_text(text)
     if lat and lon:
-        print(f"[DEBUG] Extracted DMS coordinates: Latitude={lat}, Longitude={lon}")
+        logger.debug("Extracted DMS coordinates: Latitude=%s, Longitude=%s", lat, lon)
         return lat, lon
     
     # Fallback to decimal degrees format
     # Look for patterns like "lat: 40.123, lon: -74.456" or "40.123, -74.456"
-    coord_pattern = r'(-?\d+\.?\d*)\s*[,:]\s*(-?\d+\.?\d*)'
-    matches = re.findall(coord_pattern, text)
+    # Only the first pair is used, so stop scanning at the first match
+    match = _DECIMAL_PAIR_RE.search(text)
     
-    if matches:
+    if match:
         try:
-            lat = float(matches[0][0])
-            lon = float(matches[0][1])
+            lat = float(match.group(1))
+            lon = float(match.group(2))
             # Validate reasonable coordinates
             if -90 <= lat <= 90 and -180 <= lon <= 180:
-                print(f"[DEBUG] Extracted decimal coordinates: Latitude={lat}, Longitude={lon}")
+                logger.debug("Extracted decimal coordinates: Latitude=%s, Longitude=%s", lat, lon)
                 return lat, lon
         except ValueError:
             pass
@@ -257,44 +659,74 @@ def scrape_ship_location(ship_name):
         # Direct URL to Sagittarius Leader vessel page
         vessel_url = "https://shipnext.com/vessel/9283887-sagittarius-leader"
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+        # Ask for the page only if it changed since it was last parsed
+        conditional_headers = {}
+        last_page = _last_page.get(vessel_url)
+        if last_page:
+            etag, last_modified, _ = last_page
+            if etag:
+                conditional_headers['If-None-Match'] = etag
+            if last_modified:
+                conditional_headers['If-Modified-Since'] = last_modified
         
         print(f"Fetching vessel page from shipnext.com...")
-        response = requests.get(vessel_url, headers=headers, timeout=30)
+        response = _session.get(vessel_url, headers=conditional_headers, timeout=30)
+        if response.status_code == 304 and last_page:
+            # Nothing changed, so skip the download, parse and extraction
+            print("Vessel page not modified, reusing previous result")
+            return dict(last_page[2])
         response.raise_for_status()
         
-        # Ensure proper encoding
-        response.encoding = response.apparent_encoding or 'utf-8'
+        # Ensure proper encoding; only sniff the body (a full charset-detection pass over
+        # the page) when the server didn't declare a charset
+        if 'charset' not in response.headers.get('Content-Type', '').lower():
+            response.encoding = response.apparent_encoding or 'utf-8'
         
         # Store response text BEFORE parsing (BeautifulSoup might affect response object)
         response_text = response.text
         
         # Debug: Check if position string is in response text
-        print(f"[DEBUG] Response text length: {len(response_text)}")
-        print(f"[DEBUG] 'Vessel' in response_text: {'Vessel' in response_text}")
-        print(f"[DEBUG] 'current position' in response_text: {'current position' in response_text.lower()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Response text length: %s", len(response_text))
+            logger.debug("'Vessel' in response_text: %s", 'Vessel' in response_text)
+            logger.debug("'current position' in response_text: %s", 'current position' in response_text.lower())
+        
+        # Use the C-backed lxml parser; html.parser builds the tree in pure Python and
+        # dominates parse time on large vessel pages
+        soup = BeautifulSoup(response_text, 'lxml')
         
-        # Use html.parser (more reliable for text extraction)
-        soup = BeautifulSoup(response_text, 'html.parser')
+        # Drop page chrome up front so get_text() and every regex pass over it scan
+        # fewer bytes; scripts and styles are already left out of get_text()
+        for tag in soup.find_all(_NON_CONTENT_TAGS):
+            tag.decompose()
         
         # Debug: Check if position string is in parsed text
-        parsed_text = soup.get_text()
-        print(f"[DEBUG] Parsed text length: {len(parsed_text)}")
-        print(f"[DEBUG] 'Vessel' in parsed_text: {'Vessel' in parsed_text}")
-        print(f"[DEBUG] 'current position' in parsed_text: {'current position' in parsed_text.lower()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            parsed_text = soup.get_text()
+            logger.debug("Parsed text length: %s", len(parsed_text))
+            logger.debug("'Vessel' in parsed_text: %s", 'Vessel' in parsed_text)
+            logger.debug("'current position' in parsed_text: %s", 'current position' in parsed_text.lower())
         
         # Extract destination information from the vessel detail page
         location_data = extract_from_shipnext_detail(soup, ship_name, response_text=response_text)
         
         # Print final coordinates for debugging
         if location_data and location_data.get('latitude') and location_data.get('longitude'):
-            print(f"[DEBUG] Final ship coordinates: Latitude={location_data['latitude']}, Longitude={location_data['longitude']}")
+            logger.debug("Final ship coordinates: Latitude=%s, Longitude=%s", location_data['latitude'], location_data['longitude'])
         elif location_data:
-            print(f"[DEBUG] Location data found but no coordinates. Location text: {location_data.get('location_text', 'N/A')}")
+            logger.debug("Location data found but no coordinates. Location text: %s", location_data.get('location_text', 'N/A'))
         else:
-            print("[DEBUG] No location data found")
+            logger.debug("No location data found")
+        
+        # Remember the page validators, if the server sent any, for the next conditional GET;
+        # a result without coordinates isn't kept, so a failed geocode is retried next update
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if location_data and location_data.get('latitude') is not None and \
+           location_data.get('longitude') is not None and (etag or last_modified):
+            _last_page[vessel_url] = (etag, last_modified, dict(location_data))
+        else:
+            _last_page.pop(vessel_url, None)
         
         return location_data
         
@@ -305,6 +737,96 @@ def scrape_ship_location(ship_name):
         print(f"Scraping error: {e}")
         return None
 
+def extract_script_texts(soup, response_text=None):
+    """Get the text of every non-empty script tag"""
+    if response_text:
+        # Script bodies are raw text in HTML, so slicing them out of the response with
+        # one regex pass gives the same strings without walking the whole tree
+        return tuple(body for body in _SCRIPT_BODY_RE.findall(response_text) if body)
+    return tuple(script.string for script in soup.find_all('script') if script.string)
+
+def js_destination_text(captured):
+    """Strip a destination taken from a script, or return None if it is too short or long"""
+    dest_text = captured.strip()
+    return dest_text if 2 < len(dest_text) < 100 else None
+
+def extract_script_fields(script_texts, want_destination=True, want_coordinates=True):
+    """
+    Find a destination and lat/lng coordinates in JSON/JavaScript script bodies
+    Returns (destination, latitude, longitude), with None for anything not found
+    Later scripts take precedence over earlier ones, so they are scanned last to first
+    and each lookup stops at the first script that has a value
+    """
+    destination = None
+    latitude = None
+    longitude = None
+    for script_text in reversed(script_texts):
+        script_lower = script_text.lower()
+        
+        # Look for destination in JSON structures
+        if want_destination and ('destination' in script_lower or 'port' in script_lower):
+            destination = find_first_valid(_JS_DESTINATION_SCAN_RE, script_text, js_destination_text, script_lower)
+            if destination:
+                want_destination = False
+        
+        # Look for lat/lng in JavaScript; both must come from the same script
+        if want_coordinates and 'lat' in script_lower:
+            lat_value = None
+            lng_value = None
+            for coord_match in _JS_LATLNG_RE.finditer(script_text):
+                if coord_match.group('axis').lower().startswith('lat'):
+                    lat_value = lat_value or coord_match.group('value')
+                else:
+                    lng_value = lng_value or coord_match.group('value')
+                if lat_value and lng_value:
+                    break
+            if lat_value and lng_value:
+                try:
+                    latitude = float(lat_value)
+                    longitude = float(lng_value)
+                    want_coordinates = False
+                except ValueError:
+                    pass
+        
+        if not want_destination and not want_coordinates:
+            break
+    
+    return destination, latitude, longitude
+
+def extract_residual_text(soup, script_texts=None):
+    """
+    Collect the page text that soup.get_text() leaves out: script bodies,
+    HTML comments and meta tag content
+    Scanning this instead of the full raw HTML avoids a second pass over text
+    that has already been checked
+    """
+    if script_texts is None:
+        script_texts = extract_script_texts(soup)
+    parts = list(script_texts)
+    parts.extend(str(comment) for comment in soup.find_all(string=lambda text: isinstance(text, Comment)))
+    parts.extend(meta.get('content', '') for meta in soup.find_all('meta'))
+    return '\n'.join(parts)
+
+def select_destination_elements(soup):
+    """
+    Yield candidate destination elements in order of preference, running each selector
+    only if the elements before it were all rejected
+    """
+    for selector in _DESTINATION_SELECTORS:
+        yield from soup.select(selector)
+
+def extract_table_rows(soup):
+    """
+    Collect (label, value) text pairs from the first two cells of every table row
+    Labels are lowercased for keyword matching
+    """
+    table_rows = []
+    for row in soup.select('table tr'):
+        cells = row.find_all(['td', 'th'], limit=2)
+        if len(cells) >= 2:
+            table_rows.append((cells[0].get_text(strip=True).lower(), cells[1].get_text(strip=True)))
+    return table_rows
+
 def extract_from_shipnext_search(soup, ship_name):
     """Extract destination/location data from shipnext.com search results"""
     location_data = {
@@ -319,36 +841,25 @@ def extract_from_shipnext_search(soup, ship_name):
     text_content = soup.get_text()
     
     # Try to find destination port information
-    destination_patterns = [
-        r'on route to\s+([^\n\r.]+?)(?:\.|Estimated)',  # "on route to City, Country."
-        r'route to\s+([^\n\r.]+?)(?:\.|Estimated)',  # "route to City, Country."
-        r'to\s+([A-Z][a-zA-Z\s,]+?)(?:\.|Estimated)',  # "to City, Country."
-        r'Destination[:\s]+([^\n]+)',
-        r'Port[:\s]+([^\n]+)',
-        r'Heading[:\s]+to[:\s]+([^\n]+)',
-        r'ETA[:\s]+([^\n]+)',
-    ]
-    
-    for pattern in destination_patterns:
-        match = re.search(pattern, text_content, re.I)
-        if match:
-            location_text = match.group(1).strip()
-            # Clean up the location text
-            location_text = re.sub(r'\s+', ' ', location_text)
-            # Keep both city and country (typically separated by comma)
-            # Split by comma and keep first two parts (city, country)
-            parts = [p.strip() for p in location_text.split(',')[:2]]
-            location_text = ', '.join(parts) if len(parts) > 1 else parts[0] if parts else location_text
-            location_text = location_text.split('\n')[0].strip()  # Take first line
-            location_data['location_text'] = location_text
-            break
+    # All patterns are tried in a single scan of the text
+    location_text = find_first_match(_SEARCH_DESTINATION_SCAN_RE, text_content)
+    if location_text is not None:
+        location_text = location_text.strip()
+        # Clean up the location text
+        location_text = _WHITESPACE_RE.sub(' ', location_text)
+        # Keep both city and country (typically separated by comma)
+        # Split by comma and keep first two parts (city, country)
+        parts = [p.strip() for p in location_text.split(',')[:2]]
+        location_text = ', '.join(parts) if len(parts) > 1 else parts[0] if parts else location_text
+        location_text = location_text.split('\n')[0].strip()  # Take first line
+        location_data['location_text'] = location_text
     
     # Try to find coordinates in text
     lat, lon = extract_coordinates_from_text(text_content)
     if lat and lon:
         location_data['latitude'] = lat
         location_data['longitude'] = lon
-        print(f"[DEBUG] Coordinates extracted from search results: Latitude={lat}, Longitude={lon}")
+        logger.debug("Coordinates extracted from search results: Latitude=%s, Longitude=%s", lat, lon)
     
     # If we have destination text but no coordinates, try geocoding
     if location_data['location_text'] and not location_data['latitude']:
@@ -356,7 +867,7 @@ def extract_from_shipnext_search(soup, ship_name):
         if lat and lon:
             location_data['latitude'] = lat
             location_data['longitude'] = lon
-            print(f"[DEBUG] Coordinates geocoded from location text: Latitude={lat}, Longitude={lon}")
+            logger.debug("Coordinates geocoded from location text: Latitude=%s, Longitude=%s", lat, lon)
     
     return location_data if location_data['latitude'] or location_data['location_text'] else None
 
@@ -372,142 +883,64 @@ def extract_from_shipnext_detail(soup, ship_name, response_text=None):
     # Normalize ship name for comparison (case-insensitive, strip whitespace)
     ship_name_normalized = ship_name.strip().lower() if ship_name else ''
     
-    # FIRST: Try to extract destination from HTML elements before coordinates
-    # Look for destination in common HTML structures
-    destination_elements = soup.find_all(['div', 'span', 'td', 'dd', 'p'], 
-                                        class_=re.compile(r'destination|port|location|to|next', re.I))
-    
-    # Also check for data attributes
-    destination_data_attrs = soup.find_all(attrs={'data-destination': True}) + \
-                            soup.find_all(attrs={'data-port': True}) + \
-                            soup.find_all(attrs={'data-location': True})
-    
-    # Check text content of elements with destination-related keywords
-    for elem in destination_elements + destination_data_attrs:
-        text = elem.get_text(strip=True)
-        if text and len(text) < 100:  # Reasonable destination name length
-            # Skip if it looks like coordinates, a date, button/navigation text, or generic labels
-            text_lower = text.lower()
-            skip_patterns = [
-                r'^(show|click|view|see|more|less|add|edit|delete|submit|cancel|close|open|menu|nav|link)',
-                r'(button|link|menu|nav|tab|icon|arrow|chevron)',
-                r'(trading desk|position|add position|manage)',
-                r'^(vessel|ship|boat).*status$',
-                r'status$',
-                r'latest.*AIS.*Satellite.*data',
-                r'AIS.*Satellite.*data',
-                r'Satellite.*AIS.*data',
-                r'latest.*data',
-                r'real.*time.*data',
-                r'tracking.*data',
-            ]
-            should_skip = False
-            for pattern in skip_patterns:
-                if re.search(pattern, text_lower, re.I):
-                    should_skip = True
-                    print(f"[DEBUG] Skipping HTML element text (generic): {text}")
-                    break
-            
-            if not should_skip and \
-               not re.match(r'^-?\d+\.?\d*[,\s]+-?\d+\.?\d*$', text) and \
-               not re.match(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', text) and \
-               len(text) > 2 and len(text) < 80:  # Reasonable port name length
-                # Skip if it matches the ship name
-                if ship_name_normalized and text.strip().lower() == ship_name_normalized:
-                    print(f"[DEBUG] Skipping HTML element text (ship name): {text}")
-                    should_skip = True
-                
-                # Only accept if it looks like a place name (contains letters, possibly numbers)
-                # Also check that it doesn't end with common non-place suffixes
-                if not should_skip and \
-                   re.search(r'[a-zA-Z]{3,}', text) and \
-                   not re.search(r'(data|status|info|details|more|click|here)$', text_lower):
-                    location_data['location_text'] = text
-                    print(f"[DEBUG] Destination found in HTML element: {location_data['location_text']}")
-                    break
-    
-    # Also check table structures - common on ship tracking sites
-    # Look for table rows with "Destination" or "Port" labels
-    if not location_data['location_text']:
-        tables = soup.find_all('table')
-        for table in tables:
-            rows = table.find_all('tr')
-            for row in rows:
-                cells = row.find_all(['td', 'th'])
-                if len(cells) >= 2:
-                    # Check if first cell contains destination-related keywords
-                    label_text = cells[0].get_text(strip=True).lower()
-                    if any(keyword in label_text for keyword in ['destination', 'port', 'next port', 'to', 'location']):
-                        value_text = cells[1].get_text(strip=True)
-                        # Clean and validate
-                        if value_text and len(value_text) < 100 and len(value_text) > 2:
-                            if not re.match(r'^-?\d+\.?\d*[,\s]+-?\d+\.?\d*$', value_text) and \
-                               not re.match(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', value_text):
-                                location_data['location_text'] = value_text
-                                print(f"[DEBUG] Destination found in table: {location_data['location_text']}")
-                                break
-            if location_data['location_text']:
-                break
-    
-    # Look for destination in JSON data within script tags
-    scripts = soup.find_all('script')
-    for script in scripts:
-        if script.string:
-            # Look for destination in JSON structures
-            destination_json_patterns = [
-                r'["\']destination["\']\s*:\s*["\']([^"\']+)["\']',
-                r'["\']port["\']\s*:\s*["\']([^"\']+)["\']',
-                r'["\']nextPort["\']\s*:\s*["\']([^"\']+)["\']',
-                r'["\']destinationPort["\']\s*:\s*["\']([^"\']+)["\']',
-                r'destination["\']?\s*:\s*["\']([^"\']+)["\']',
-            ]
-            
-            for pattern in destination_json_patterns:
-                dest_match = re.search(pattern, script.string, re.I)
-                if dest_match:
-                    dest_text = dest_match.group(1).strip()
-                    if dest_text and len(dest_text) < 100 and len(dest_text) > 2:
-                        location_data['location_text'] = dest_text
-                        print(f"[DEBUG] Destination found in JSON/JavaScript: {location_data['location_text']}")
-                        break
-            
-            # Look for lat/lng in JavaScript
-            lat_match = re.search(r'lat[itude]*["\']?\s*[:=]\s*(-?\d+\.?\d*)', script.string, re.I)
-            lng_match = re.search(r'lng|lon[gitude]*["\']?\s*[:=]\s*(-?\d+\.?\d*)', script.string, re.I)
-            
-            if lat_match and lng_match:
-                try:
-                    location_data['latitude'] = float(lat_match.group(1))
-                    location_data['longitude'] = float(lng_match.group(1))
-                    print(f"[DEBUG] Coordinates found in JavaScript: Latitude={location_data['latitude']}, Longitude={location_data['longitude']}")
-                    # Don't break here - continue looking for destination
-                except ValueError:
-                    pass
+    # Script bodies are read once, from the raw response when there is one, and shared
+    # by the JavaScript scan and the raw HTML fallbacks
+    script_texts = extract_script_texts(soup, response_text)
     
-    # Extract text content
+    # Extract text content, lowercased once for every caseless scan below
     text_content = soup.get_text()
+    text_content_lower = text_content.lower()
+    # The raw HTML fallbacks only need what get_text() leaves out (scripts, comments,
+    # meta content), which is gathered lazily the first time a fallback runs
+    residual_text = None
+    residual_text_lower = None
     
     # FIRST PRIORITY: Look for coordinates after "Vessel's current position is"
     # Try with parsed text first
-    print(f"[DEBUG] Checking for position string in text (text length: {len(text_content)})...")
+    logger.debug("Checking for position string in text (text length: %s)...", len(text_content))
     lat, lon = extract_coordinates_after_position_string(text_content)
     
     # If not found in parsed text, try raw HTML (position string might be in script or special tags)
     if (not lat or not lon) and response_text:
-        print(f"[DEBUG] Trying raw HTML text (length: {len(response_text)})...")
-        lat, lon = extract_coordinates_after_position_string(response_text)
+        residual_text = extract_residual_text(soup, script_texts)
+        logger.debug("Trying raw HTML text (length: %s)...", len(residual_text))
+        lat, lon = extract_coordinates_after_position_string(residual_text)
     
-    print(f"[DEBUG] Position string extraction returned: lat={lat}, lon={lon}")
+    logger.debug("Position string extraction returned: lat=%s, lon=%s", lat, lon)
     if lat and lon:
         location_data['latitude'] = lat
         location_data['longitude'] = lon
-        print(f"[DEBUG] Coordinates extracted from 'Vessel's current position is': Latitude={lat}, Longitude={lon}")
-    else:
-        print(f"[DEBUG] Position string extraction failed, checking if 'Vessel' in text: {'Vessel' in text_content}")
-        print(f"[DEBUG] Checking if 'current position' in text: {'current position' in text_content.lower()}")
+        logger.debug("Coordinates extracted from 'Vessel's current position is': Latitude=%s, Longitude=%s", lat, lon)
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Position string extraction failed, checking if 'Vessel' in text: %s", 'Vessel' in text_content)
+        logger.debug("Checking if 'current position' in text: %s", 'current position' in text_content_lower)
         if response_text:
-            print(f"[DEBUG] Checking if 'Vessel' in raw HTML: {'Vessel' in response_text}")
-            print(f"[DEBUG] Checking if 'current position' in raw HTML: {'current position' in response_text.lower()}")
+            logger.debug("Checking if 'Vessel' in raw HTML: %s", 'Vessel' in response_text)
+            logger.debug("Checking if 'current position' in raw HTML: %s", 'current position' in response_text.lower())
+    
+    # Look for destination port information (ShipNext focus)
+    # Text patterns are the most reliable source and take priority over the HTML element,
+    # table and JavaScript lookups below, which only run when the text scan finds nothing
+    location_text = find_place_text(_DESTINATION_SCAN_RE, text_content, _DESTINATION_PREFIX_RE,
+                                    text_lower=text_content_lower)
+    if location_text:
+        location_data['location_text'] = location_text
+        logger.debug("Destination extracted from text pattern: %s", location_data['location_text'])
+    
+    # Look for destination and lat/lng in JSON data within script tags
+    # Only what is still missing is looked for; a JavaScript destination takes priority over
+    # the HTML element and table lookups below
+    want_destination = location_data['location_text'] is None
+    want_coordinates = location_data['latitude'] is None
+    if want_destination or want_coordinates:
+        js_destination, js_lat, js_lon = extract_script_fields(script_texts, want_destination, want_coordinates)
+        if js_destination:
+            location_data['location_text'] = js_destination
+            logger.debug("Destination found in JSON/JavaScript: %s", location_data['location_text'])
+        if js_lat is not None:
+            location_data['latitude'] = js_lat
+            location_data['longitude'] = js_lon
+            logger.debug("Coordinates found in JavaScript: Latitude=%s, Longitude=%s", location_data['latitude'], location_data['longitude'])
     
     # Try to find coordinates in text (only if not found above)
     if not location_data['latitude']:
@@ -515,265 +948,104 @@ def extract_from_shipnext_detail(soup, ship_name, response_text=None):
         if lat and lon:
             location_data['latitude'] = lat
             location_data['longitude'] = lon
-            print(f"[DEBUG] Coordinates extracted from detail page text: Latitude={lat}, Longitude={lon}")
+            logger.debug("Coordinates extracted from detail page text: Latitude=%s, Longitude=%s", lat, lon)
     
-    # Look for destination port information (ShipNext focus)
-    # Try text patterns FIRST (more reliable than HTML element matching)
-    # This will override HTML element matching if it finds a better match
-    if True:  # Always check text patterns to find the best destination
-        destination_patterns = [
-            r'on route to\s+([^\n\r.]+?)(?:\.|Estimated)',  # "on route to Iquique, Chile."
-            r'route to\s+([^\n\r.]+?)(?:\.|Estimated)',  # "route to Iquique, Chile."
-            r'to\s+([A-Z][a-zA-Z\s,]+?)(?:\.|Estimated)',  # "to Iquique, Chile."
-            r'from\s+[^\.]+?\s+to\s+([^\n\r.]+?)(?:\.|$)',  # "from X to Iquique, Chile."
-            r'Destination[:\s]+([^\n\r]+)',
-            r'Port[:\s]+([^\n\r]+)',
-            r'Heading[:\s]+to[:\s]+([^\n\r]+)',
-            r'Next Port[:\s]+([^\n\r]+)',
-            r'Next Port of Call[:\s]+([^\n\r]+)',
-            r'Destination Port[:\s]+([^\n\r]+)',
-            r'Going to[:\s]+([^\n\r]+)',
-            r'Bound for[:\s]+([^\n\r]+)',
-            r'Current Port[:\s]+([^\n\r]+)',
-            r'Location[:\s]+([^\n\r]+)',
-            r'At[:\s]+([^\n\r]+)',  # "At: Port Name"
-        ]
-        
-        for pattern in destination_patterns:
-            match = re.search(pattern, text_content, re.I)
-            if match:
-                location_text = match.group(1).strip()
-                # Clean up the location text
-                location_text = re.sub(r'\s+', ' ', location_text)
-                # Remove common prefixes/suffixes
-                location_text = re.sub(r'^(port|to|at|in|for)\s+', '', location_text, flags=re.I)
-                # Keep both city and country (typically separated by comma)
-                # Split by comma and keep first two parts (city, country)
-                parts = [p.strip() for p in location_text.split(',')[:2]]
-                location_text = ', '.join(parts) if len(parts) > 1 else parts[0] if parts else location_text
-                location_text = location_text.split('\n')[0].strip()
-                location_text = location_text.split('/')[0].strip()  # Sometimes "Port A / Port B"
-                
-                # Skip generic metadata/advertising phrases
-                skip_phrases = [
-                    r'latest.*AIS.*Satellite.*data',
-                    r'AIS.*Satellite.*data',
-                    r'Satellite.*AIS.*data',
-                    r'latest.*data',
-                    r'real.*time.*data',
-                    r'tracking.*data',
-                    r'vessel.*status',
-                    r'ship.*status',
-                    r'position.*data',
-                    r'location.*data',
-                    r'click.*here',
-                    r'show.*more',
-                    r'view.*details',
-                    r'see.*more',
-                ]
-                should_skip = False
-                location_text_lower = location_text.lower()
-                for phrase in skip_phrases:
-                    if re.search(phrase, location_text_lower, re.I):
-                        should_skip = True
-                        print(f"[DEBUG] Skipping generic phrase: {location_text}")
-                        break
+    # Next try to extract destination from HTML elements
+    # Look for destination in common HTML structures
+    # along with elements carrying destination data attributes
+    if not location_data['location_text']:
+        destination_elements = select_destination_elements(soup)
+    else:
+        destination_elements = []
+    
+    # Check text content of elements with destination-related keywords
+    for elem in destination_elements:
+        text = elem.get_text(strip=True)
+        if text and len(text) < 100:  # Reasonable destination name length
+            # Skip if it looks like coordinates, a date, button/navigation text, or generic labels
+            text_lower = text.lower()
+            should_skip = text_lower.startswith(_SKIP_PREFIXES)
+            if not should_skip:
+                should_skip = _ELEMENT_SKIP_RE.search(text_lower) is not None
+            if should_skip:
+                logger.debug("Skipping HTML element text (generic): %s", text)
+            
+            if not should_skip and \
+               not is_numeric_text(text) and \
+               not (starts_numeric(text) and _DATE_RE.match(text)) and \
+               len(text) > 2 and len(text) < 80:  # Reasonable port name length
+                # Skip if it matches the ship name
+                if ship_name_normalized and text.strip().lower() == ship_name_normalized:
+                    logger.debug("Skipping HTML element text (ship name): %s", text)
+                    should_skip = True
                 
-                # Skip if it looks like a date, coordinates, too short, or generic phrase
+                # Only accept if it looks like a place name (contains letters, possibly numbers)
+                # Also check that it doesn't end with common non-place suffixes
                 if not should_skip and \
-                   not re.match(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', location_text) and \
-                   not re.match(r'^-?\d+\.?\d*[,\s]+-?\d+\.?\d*$', location_text) and \
-                   len(location_text) > 2 and len(location_text) < 100 and \
-                   re.search(r'[a-zA-Z]{3,}', location_text):  # Must have letters (place name)
-                    location_data['location_text'] = location_text
-                    print(f"[DEBUG] Destination extracted from text pattern: {location_data['location_text']}")
+                   _HAS_LETTERS_RE.search(text) and \
+                   not _NON_PLACE_SUFFIX_RE.search(text_lower):
+                    location_data['location_text'] = text
+                    logger.debug("Destination found in HTML element: %s", location_data['location_text'])
                     break
-        
-        # Also try raw HTML if destination not found in parsed text
-        if not location_data['location_text'] and response_text:
-            for pattern in destination_patterns:
-                match = re.search(pattern, response_text, re.I)
-                if match:
-                    location_text = match.group(1).strip()
-                    location_text = re.sub(r'\s+', ' ', location_text)
-                    location_text = re.sub(r'^(port|to|at|in|for)\s+', '', location_text, flags=re.I)
-                    # Keep both city and country (typically separated by comma)
-                    # Split by comma and keep first two parts (city, country)
-                    parts = [p.strip() for p in location_text.split(',')[:2]]
-                    location_text = ', '.join(parts) if len(parts) > 1 else parts[0] if parts else location_text
-                    location_text = location_text.split('\n')[0].strip()
-                    location_text = location_text.split('/')[0].strip()
-                    
-                    # Skip generic metadata/advertising phrases
-                    skip_phrases = [
-                        r'latest.*AIS.*Satellite.*data',
-                        r'AIS.*Satellite.*data',
-                        r'Satellite.*AIS.*data',
-                        r'latest.*data',
-                        r'real.*time.*data',
-                        r'tracking.*data',
-                        r'vessel.*status',
-                        r'ship.*status',
-                        r'position.*data',
-                        r'location.*data',
-                        r'click.*here',
-                        r'show.*more',
-                        r'view.*details',
-                        r'see.*more',
-                    ]
-                    should_skip = False
-                    location_text_lower = location_text.lower()
-                    for phrase in skip_phrases:
-                        if re.search(phrase, location_text_lower, re.I):
-                            should_skip = True
-                            print(f"[DEBUG] Skipping generic phrase: {location_text}")
-                            break
-                    
-                    # Skip if it looks like a date, coordinates, too short, or generic phrase
-                    if not should_skip and \
-                       not re.match(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', location_text) and \
-                       not re.match(r'^-?\d+\.?\d*[,\s]+-?\d+\.?\d*$', location_text) and \
-                       len(location_text) > 2 and len(location_text) < 100 and \
-                       re.search(r'[a-zA-Z]{3,}', location_text):  # Must have letters (place name)
-                        location_data['location_text'] = location_text
-                        print(f"[DEBUG] Destination extracted from raw HTML: {location_data['location_text']}")
-                        break
     
-    # Extract origin city (city the ship is proceeding from)
-    # Look for origin patterns in text content
-    origin_patterns = [
-        r'from\s+([^\n\r.]+?)\s+to\s+',  # "from X to Y" - extract X
-        r'proceeding\s+from\s+([^\n\r.]+?)(?:\s+to|\s*\.|$)',  # "proceeding from X to Y" or "proceeding from X."
-        r'departed\s+from\s+([^\n\r.]+?)(?:\s+to|\s*\.|$)',  # "departed from X"
-        r'Origin[:\s]+([^\n\r]+)',  # "Origin: X"
-        r'From Port[:\s]+([^\n\r]+)',  # "From Port: X"
-        r'Last Port[:\s]+([^\n\r]+)',  # "Last Port: X"
-        r'Previous Port[:\s]+([^\n\r]+)',  # "Previous Port: X"
-        r'Port of Origin[:\s]+([^\n\r]+)',  # "Port of Origin: X"
-    ]
+    # Also check table structures - common on ship tracking sites
+    # Look for table rows with "Destination" or "Port" labels
+    # Rows are collected in one walk and shared with the origin lookup below
+    table_rows = None
+    if not location_data['location_text']:
+        table_rows = extract_table_rows(soup)
+        for label_text, value_text in table_rows:
+            # Check if first cell contains destination-related keywords
+            if _TABLE_DESTINATION_LABEL_RE.search(label_text):
+                # Clean and validate
+                if is_valid_place(value_text):
+                    location_data['location_text'] = value_text
+                    logger.debug("Destination found in table: %s", location_data['location_text'])
+                    break
+    
+    # Also try raw HTML if destination not found anywhere else
+    if not location_data['location_text'] and response_text:
+        if residual_text is None:
+            residual_text = extract_residual_text(soup, script_texts)
+        residual_text_lower = residual_text.lower()
+        location_text = find_place_text(_DESTINATION_SCAN_RE, residual_text, _DESTINATION_PREFIX_RE,
+                                        text_lower=residual_text_lower)
+        if location_text:
+            location_data['location_text'] = location_text
+            logger.debug("Destination extracted from raw HTML: %s", location_data['location_text'])
     
+    # Extract origin city (city the ship is proceeding from)
     # Try text content first
-    for pattern in origin_patterns:
-        match = re.search(pattern, text_content, re.I)
-        if match:
-            origin_text = match.group(1).strip()
-            # Clean up the origin text
-            origin_text = re.sub(r'\s+', ' ', origin_text)
-            # Remove common prefixes/suffixes
-            origin_text = re.sub(r'^(port|from|at|in|for)\s+', '', origin_text, flags=re.I)
-            # Keep both city and country (typically separated by comma)
-            # Split by comma and keep first two parts (city, country)
-            parts = [p.strip() for p in origin_text.split(',')[:2]]
-            origin_text = ', '.join(parts) if len(parts) > 1 else parts[0] if parts else origin_text
-            origin_text = origin_text.split('\n')[0].strip()
-            origin_text = origin_text.split('/')[0].strip()  # Sometimes "Port A / Port B"
-            
-            # Skip generic metadata/advertising phrases
-            skip_phrases = [
-                r'latest.*AIS.*Satellite.*data',
-                r'AIS.*Satellite.*data',
-                r'Satellite.*AIS.*data',
-                r'latest.*data',
-                r'real.*time.*data',
-                r'tracking.*data',
-                r'vessel.*status',
-                r'ship.*status',
-                r'position.*data',
-                r'location.*data',
-                r'click.*here',
-                r'show.*more',
-                r'view.*details',
-                r'see.*more',
-            ]
-            should_skip = False
-            origin_text_lower = origin_text.lower()
-            for phrase in skip_phrases:
-                if re.search(phrase, origin_text_lower, re.I):
-                    should_skip = True
-                    print(f"[DEBUG] Skipping generic phrase for origin: {origin_text}")
-                    break
-            
-            # Skip if it looks like a date, coordinates, too short, or generic phrase
-            if not should_skip and \
-               not re.match(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', origin_text) and \
-               not re.match(r'^-?\d+\.?\d*[,\s]+-?\d+\.?\d*$', origin_text) and \
-               len(origin_text) > 2 and len(origin_text) < 100 and \
-               re.search(r'[a-zA-Z]{3,}', origin_text):  # Must have letters (place name)
-                location_data['origin_city'] = origin_text
-                print(f"[DEBUG] Origin city extracted from text pattern: {location_data['origin_city']}")
-                break
+    origin_text = find_place_text(_ORIGIN_SCAN_RE, text_content, _ORIGIN_PREFIX_RE,
+                                  text_lower=text_content_lower)
+    if origin_text:
+        location_data['origin_city'] = origin_text
+        logger.debug("Origin city extracted from text pattern: %s", location_data['origin_city'])
     
     # Also try raw HTML if origin not found in parsed text
     if not location_data['origin_city'] and response_text:
-        for pattern in origin_patterns:
-            match = re.search(pattern, response_text, re.I)
-            if match:
-                origin_text = match.group(1).strip()
-                origin_text = re.sub(r'\s+', ' ', origin_text)
-                origin_text = re.sub(r'^(port|from|at|in|for)\s+', '', origin_text, flags=re.I)
-                # Keep both city and country (typically separated by comma)
-                # Split by comma and keep first two parts (city, country)
-                parts = [p.strip() for p in origin_text.split(',')[:2]]
-                origin_text = ', '.join(parts) if len(parts) > 1 else parts[0] if parts else origin_text
-                origin_text = origin_text.split('\n')[0].strip()
-                origin_text = origin_text.split('/')[0].strip()
-                
-                # Skip generic metadata/advertising phrases
-                skip_phrases = [
-                    r'latest.*AIS.*Satellite.*data',
-                    r'AIS.*Satellite.*data',
-                    r'Satellite.*AIS.*data',
-                    r'latest.*data',
-                    r'real.*time.*data',
-                    r'tracking.*data',
-                    r'vessel.*status',
-                    r'ship.*status',
-                    r'position.*data',
-                    r'location.*data',
-                    r'click.*here',
-                    r'show.*more',
-                    r'view.*details',
-                    r'see.*more',
-                ]
-                should_skip = False
-                origin_text_lower = origin_text.lower()
-                for phrase in skip_phrases:
-                    if re.search(phrase, origin_text_lower, re.I):
-                        should_skip = True
-                        print(f"[DEBUG] Skipping generic phrase for origin: {origin_text}")
-                        break
-                
-                # Skip if it looks like a date, coordinates, too short, or generic phrase
-                if not should_skip and \
-                   not re.match(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', origin_text) and \
-                   not re.match(r'^-?\d+\.?\d*[,\s]+-?\d+\.?\d*$', origin_text) and \
-                   len(origin_text) > 2 and len(origin_text) < 100 and \
-                   re.search(r'[a-zA-Z]{3,}', origin_text):  # Must have letters (place name)
-                    location_data['origin_city'] = origin_text
-                    print(f"[DEBUG] Origin city extracted from raw HTML: {location_data['origin_city']}")
-                    break
+        if residual_text is None:
+            residual_text = extract_residual_text(soup, script_texts)
+        if residual_text_lower is None:
+            residual_text_lower = residual_text.lower()
+        origin_text = find_place_text(_ORIGIN_SCAN_RE, residual_text, _ORIGIN_PREFIX_RE,
+                                      text_lower=residual_text_lower)
+        if origin_text:
+            location_data['origin_city'] = origin_text
+            logger.debug("Origin city extracted from raw HTML: %s", location_data['origin_city'])
     
     # Also check table structures for origin
     if not location_data['origin_city']:
-        tables = soup.find_all('table')
-        for table in tables:
-            rows = table.find_all('tr')
-            for row in rows:
-                cells = row.find_all(['td', 'th'])
-                if len(cells) >= 2:
-                    # Check if first cell contains origin-related keywords
-                    label_text = cells[0].get_text(strip=True).lower()
-                    if any(keyword in label_text for keyword in ['origin', 'from', 'last port', 'previous port', 'departed']):
-                        value_text = cells[1].get_text(strip=True)
-                        # Clean and validate
-                        if value_text and len(value_text) < 100 and len(value_text) > 2:
-                            if not re.match(r'^-?\d+\.?\d*[,\s]+-?\d+\.?\d*$', value_text) and \
-                               not re.match(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', value_text):
-                                location_data['origin_city'] = value_text
-                                print(f"[DEBUG] Origin city found in table: {location_data['origin_city']}")
-                                break
-            if location_data['origin_city']:
-                break
+        if table_rows is None:
+            table_rows = extract_table_rows(soup)
+        for label_text, value_text in table_rows:
+            # Check if first cell contains origin-related keywords
+            if _TABLE_ORIGIN_LABEL_RE.search(label_text):
+                # Clean and validate
+                if is_valid_place(value_text):
+                    location_data['origin_city'] = value_text
+                    logger.debug("Origin city found in table: %s", location_data['origin_city'])
+                    break
     
     # Geocode destination if needed
     if location_data['location_text'] and not location_data['latitude']:
@@ -781,23 +1053,24 @@ def extract_from_shipnext_detail(soup, ship_name, response_text=None):
         if lat and lon:
             location_data['latitude'] = lat
             location_data['longitude'] = lon
-            print(f"[DEBUG] Coordinates geocoded from destination text: Latitude={lat}, Longitude={lon}")
+            logger.debug("Coordinates geocoded from destination text: Latitude=%s, Longitude=%s", lat, lon)
     
     # Return data if we have at least location text or coordinates
     # Log what we're returning for debugging
-    if location_data['location_text']:
-        print(f"[DEBUG] Final destination text: {location_data['location_text']}")
-    else:
-        print("[DEBUG] WARNING: Destination could not be found by the scraper")
-    
-    if location_data['origin_city']:
-        print(f"[DEBUG] Final origin city: {location_data['origin_city']}")
-    else:
-        print("[DEBUG] WARNING: Origin city could not be found by the scraper")
-    
-    if location_data['latitude'] and location_data['longitude']:
-        print(f"[DEBUG] Final coordinates: {location_data['latitude']}, {location_data['longitude']}")
-    else:
-        print("[DEBUG] WARNING: Coordinates could not be found by the scraper")
+    if logger.isEnabledFor(logging.DEBUG):
+        if location_data['location_text']:
+            logger.debug("Final destination text: %s", location_data['location_text'])
+        else:
+            logger.debug("WARNING: Destination could not be found by the scraper")
+        
+        if location_data['origin_city']:
+            logger.debug("Final origin city: %s", location_data['origin_city'])
+        else:
+            logger.debug("WARNING: Origin city could not be found by the scraper")
+        
+        if location_data['latitude'] and location_data['longitude']:
+            logger.debug("Final coordinates: %s, %s", location_data['latitude'], location_data['longitude'])
+        else:
+            logger.debug("WARNING: Coordinates could not be found by the scraper")
     
     return location_data if (location_data['latitude'] or location_data['location_text']) else None
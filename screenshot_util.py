@@ -1,58 +1,142 @@
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from concurrent.futures import ThreadPoolExecutor
+import io
 import os
 from datetime import datetime
 from PIL import Image
 
 SCREENSHOT_PATH = 'static/screenshots/current.bmp'
+# The page is laid out at VIEWPORT_SIZE and rendered at SCREENSHOT_SIZE's width; the full
+# page is taller than the viewport, so the capture is then squashed to SCREENSHOT_SIZE
+VIEWPORT_SIZE = (1440, 960)
+SCREENSHOT_SIZE = (960, 640)
+# Bits per pixel of the saved BMP: 24 (full colour, default), 8 (256-colour adaptive
+# palette) or 1 (dithered black and white) for small LCD / e-ink displays
+_SUPPORTED_BPP = ('1', '8', '24')
+
+def _screenshot_bpp():
+    """Read SCREENSHOT_BPP, falling back to 24 for unsupported values rather than failing at import"""
+    value = os.environ.get('SCREENSHOT_BPP', '24').strip()
+    if value not in _SUPPORTED_BPP:
+        print(f"[{datetime.now()}] Warning: unsupported SCREENSHOT_BPP={value!r} (expected 1, 8 or 24), using 24")
+        return 24
+    return int(value)
+
+SCREENSHOT_BPP = _screenshot_bpp()
+
+# True once the map has tiles and Leaflet has marked every one of them as done
+# (Leaflet adds leaflet-tile-loaded after both successful and failed loads)
+_TILES_LOADED_JS = """() => {
+    const tiles = document.querySelectorAll('img.leaflet-tile');
+    return tiles.length > 0 &&
+        Array.from(tiles).every(t => t.complete && t.classList.contains('leaflet-tile-loaded'));
+}"""
+
+# Playwright's sync API may only be used from the thread that started it, so every
+# capture runs on this one thread, which owns the long-lived browser below
+_screenshot_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='screenshot')
+_playwright = None
+_browser = None
+
+def _get_browser():
+    """Return the shared headless browser, launching it on first use"""
+    global _playwright, _browser
+    if _browser is None or not _browser.is_connected():
+        if _playwright is None:
+            _playwright = sync_playwright().start()
+        # Launch browser in headless mode
+        _browser = _playwright.chromium.launch(headless=True)
+    return _browser
+
+def _reset_browser():
+    """Shut down the shared browser so the next screenshot starts a fresh one"""
+    global _playwright, _browser
+    try:
+        if _browser is not None:
+            _browser.close()
+        if _playwright is not None:
+            _playwright.stop()
+    except Exception as e:
+        print(f"[{datetime.now()}] Error closing browser: {e}")
+    _browser = None
+    _playwright = None
 
 def take_screenshot(url='http://localhost:3000'):
     """
     Take a screenshot of the application and save it to static/screenshots folder
     Replaces the previous screenshot
     """
+    return _screenshot_executor.submit(_take_screenshot, url).result()
+
+def _take_screenshot(url):
+    """Capture the screenshot on the screenshot thread, reusing the running browser"""
     try:
         print(f"[{datetime.now()}] Taking screenshot of application at {url}...")
         
         # Ensure screenshots directory exists
         os.makedirs(os.path.dirname(SCREENSHOT_PATH), exist_ok=True)
         
-        with sync_playwright() as p:
-            # Launch browser in headless mode
-            browser = p.chromium.launch(headless=True)
-            
-            # Create a new page with viewport size at 1440x960
-            page = browser.new_page(viewport={'width': 1440, 'height': 960})
-            
+        browser = _get_browser()
+        
+        # Create a new page with viewport size at 1440x960, scaled so the browser renders
+        # at the 960 pixel output width instead of leaving that downscale to PIL
+        page = browser.new_page(
+            viewport={'width': VIEWPORT_SIZE[0], 'height': VIEWPORT_SIZE[1]},
+            device_scale_factor=SCREENSHOT_SIZE[0] / VIEWPORT_SIZE[0]
+        )
+        try:
             # Navigate to the application
             page.goto(url, wait_until='networkidle', timeout=30000)
             
-            # Wait a bit for map to load
-            page.wait_for_timeout(3000)
-            
-            # Take screenshot to a temporary PNG file first
-            temp_path = SCREENSHOT_PATH.replace('.bmp', '_temp.png')
-            page.screenshot(path=temp_path, full_page=True)
+            # Wait for the map tiles to finish loading rather than a fixed 3 seconds; the
+            # 3 second ceiling keeps the worst case no slower than the old fixed delay
+            try:
+                page.wait_for_function(_TILES_LOADED_JS, timeout=3000)
+                # Let the 200ms Leaflet tile fade-in finish
+                page.wait_for_timeout(250)
+            except PlaywrightTimeoutError:
+                # Some tiles are still loading; capture what's there
+                pass
             
-            # Close browser
-            browser.close()
-        
-        # Open the screenshot, resize it to 960x640, and convert to BMP
-        with Image.open(temp_path) as img:
-            # Resize to 960x640
-            resized_img = img.resize((960, 640), Image.Resampling.LANCZOS)
-            # Convert to BMP and save
-            resized_img.save(SCREENSHOT_PATH, 'BMP')
+            # Take screenshot in memory rather than through a temporary PNG file
+            png_bytes = page.screenshot(full_page=True)
+        finally:
+            # Close the page; the browser stays up for the next screenshot
+            page.close()
         
-        # Remove temporary PNG file
-        os.remove(temp_path)
+        # Open the screenshot and convert to BMP
+        with Image.open(io.BytesIO(png_bytes)) as img:
+            # The full-page capture is already 960 wide but taller than 640 (the page runs
+            # past the viewport), so it is squashed to 960x640 on every capture; this keeps
+            # the whole page on the display at the cost of its aspect ratio, as before
+            if img.size != SCREENSHOT_SIZE:
+                # reducing_gap lets Pillow shrink a very tall page by a whole factor with the
+                # cheap box reduce() first, leaving Lanczos only the last, small step
+                img = img.resize(SCREENSHOT_SIZE, Image.Resampling.LANCZOS, reducing_gap=2.0)
+            # Chromium's PNG carries an alpha channel the page never uses; dropping it
+            # writes a 24-bit BMP instead of a 32-bit one, a quarter fewer bytes
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            # Optionally reduce the colour depth for displays that can't show more
+            if SCREENSHOT_BPP == 8:
+                img = img.quantize(colors=256)
+            elif SCREENSHOT_BPP == 1:
+                img = img.convert('1')
+            # Convert to BMP and save next to the published file, then swap it in with an
+            # atomic rename so /screenshots/current.bmp is never served half-written
+            temp_path = SCREENSHOT_PATH + '.tmp'
+            img.save(temp_path, 'BMP')
+        os.replace(temp_path, SCREENSHOT_PATH)
             
         print(f"[{datetime.now()}] Screenshot saved successfully to {SCREENSHOT_PATH}")
-        print(f"[{datetime.now()}] Screenshot captured at 1440x960, resized to 960x650, and saved as BMP")
+        print(f"[{datetime.now()}] Screenshot captured at {SCREENSHOT_SIZE[0]}x{SCREENSHOT_SIZE[1]} and saved as BMP")
         print(f"[{datetime.now()}] Screenshot accessible at: /screenshots/current.bmp")
         return True
         
     except Exception as e:
         print(f"[{datetime.now()}] Error taking screenshot: {e}")
+        # The browser may be in a bad state; start a fresh one next time
+        _reset_browser()
         return False
 
 def get_screenshot_path():
@@ -3,10 +3,15 @@
 Test script to verify destination extraction and display
 """
 import json
+import logging
+import os
 import sqlite3
 from scraper import scrape_ship_location
 from scheduler import update_ship_location
 
+# Scraper diagnostics are logged at DEBUG; set LOG_LEVEL=DEBUG to see them
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper())
+
 def test_scraper():
     """Test the scraper directly"""
     print("=" * 60)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Offline test script for the text extraction helpers in scraper.py
+Checks the single-pass pattern scans against trying each pattern in order with
+its own search, on fixed text samples (no network access needed)
+"""
+import re
+from bs4 import BeautifulSoup
+from scraper import (
+    compile_pattern_set, find_first_match, find_place_text, clean_place_text, is_valid_place,
+    extract_script_fields, js_destination_text, _JS_DESTINATION_PATTERNS,
+    select_destination_elements,
+    _DESTINATION_PATTERNS, _DESTINATION_SCAN_RE, _DESTINATION_PREFIX_RE,
+    _ORIGIN_PATTERNS, _ORIGIN_SCAN_RE, _ORIGIN_PREFIX_RE,
+    _SEARCH_DESTINATION_PATTERNS, _SEARCH_DESTINATION_SCAN_RE,
+    _DMS_LAT_PATTERNS, _DMS_LAT_SCAN_RE, _DMS_LON_PATTERNS, _DMS_LON_SCAN_RE,
+)
+
+# (text, expected destination)
+DESTINATION_SAMPLES = [
+    ("Sagittarius Leader is on route to Iquique, Chile. Estimated arrival 12/05", "Iquique, Chile"),
+    # The clause runs well past 100 characters before its terminator
+    ("Sagittarius Leader is on route to Iquique, Chile, after a long voyage across the South "
+     "Atlantic and around Cape Horn with a bunkering stop off Montevideo on the way "
+     "Estimated arrival 12/05", "Iquique, Chile"),
+    ("Destination: latest AIS Satellite data\nNext Port: Callao, Peru", "Callao, Peru"),
+    ("Vessel status\nBound for: Rotterdam\n", "Rotterdam"),
+    # Lowercasing İ adds a character, so the scan falls back to the original text
+    ("Kaptan İbrahim reports the ship on route to İzmir, Türkiye. Estimated", "İzmir, Türkiye"),
+    ("Ürümqi-built vessel on route to Ålesund, Norway.", "Ålesund, Norway"),
+    ("No voyage information available", None),
+]
+
+# (text, expected origin)
+ORIGIN_SAMPLES = [
+    ("The ship is proceeding from Santos, Brazil to Iquique, Chile.", "Santos, Brazil"),
+    ("Sailed from Santos, Brazil, where she loaded vehicles and spare parts for the west coast "
+     "of South America over several days of heavy rain, to Iquique, Chile.", "Santos, Brazil"),
+    ("Last Port: Zeebrugge, Belgium\nOrigin: 12/05/2024", "Zeebrugge, Belgium"),
+    ("İnebolu departure. Departed from Gemlik, Türkiye.", "Gemlik, Türkiye"),
+]
+
+# (text, expected search page destination)
+SEARCH_SAMPLES = [
+    ("ETA: 12/05\nDestination: Iquique", "Iquique"),
+    ("Sagittarius Leader on route to Callao, Peru. Port: Lima", "Callao, Peru"),
+    ("Nothing to see", None),
+]
+
+# (text, expected DMS latitude, expected DMS longitude)
+DMS_SAMPLES = [
+    ("Lat: 12°30'15\"N Lon: 45°10'5\"W", "12°30'15\"N", "45°10'5\"W"),
+    ("Position 33°2'11\"S / 71°37'8\"W", "33°2'11\"S", "71°37'8\"W"),
+]
+
+# (script bodies in page order, expected (destination, latitude, longitude))
+SCRIPT_SAMPLES = [
+    (['var config = {"port": "Antwerp"};',
+      'window.vessel = {"destination": "Iquique, Chile", "lat": -20.21, "lng": -70.15};'],
+     ("Iquique, Chile", -20.21, -70.15)),
+    (['map.setView({lat: 51.9, lng: 4.1});', '{"nextPort": "Rotterdam"}', 'var x = 1;'],
+     ("Rotterdam", 51.9, 4.1)),
+    (['{"destination": "Callao"}', '{"destination": "XY"}'], ("Callao", None, None)),
+]
+
+# (HTML, expected text of the first candidate destination element)
+ELEMENT_SAMPLES = [
+    ('<div data-port="x">Antwerp</div><div class="destination">Iquique, Chile</div>', "Iquique, Chile"),
+    ('<span data-location="y">Callao</span><p data-destination="z">Valparaiso</p>', "Valparaiso"),
+    ('<td class="next-port">Rotterdam</td><div class="port-name">Antwerp</div>', "Rotterdam"),
+]
+
+def ordered_search(patterns, text, accept=lambda captured: captured):
+    """Try each pattern in order with its own search, as the scraper used to"""
+    for pattern in patterns:
+        match = re.search(pattern, text, re.I)
+        if match:
+            value = accept(match.group(1))
+            if value is not None:
+                return value
+    return None
+
+def place_accept(prefix_re):
+    """Clean and validate a captured place name the way find_place_text does"""
+    def accept(captured):
+        candidate = clean_place_text(captured, prefix_re)
+        return candidate if is_valid_place(candidate) else None
+    return accept
+
+def ordered_script_fields(script_texts):
+    """
+    Scan every script in page order, later values overwriting earlier ones, as the scraper
+    used to (with the longitude alternation grouped so a bare "lng" can't match)
+    """
+    destination = None
+    latitude = None
+    longitude = None
+    for script_text in script_texts:
+        destination = ordered_search(_JS_DESTINATION_PATTERNS, script_text, js_destination_text) or destination
+        lat_match = re.search(r'lat[itude]*["\']?\s*[:=]\s*(-?\d+\.?\d*)', script_text, re.I)
+        lng_match = re.search(r'(?:lng|lon[gitude]*)["\']?\s*[:=]\s*(-?\d+\.?\d*)', script_text, re.I)
+        if lat_match and lng_match:
+            latitude = float(lat_match.group(1))
+            longitude = float(lng_match.group(1))
+    return destination, latitude, longitude
+
+def ordered_elements(soup):
+    """List candidate destination elements as the scraper used to: class matches, then each data attribute"""
+    return soup.find_all(['div', 'span', 'td', 'dd', 'p'],
+                         class_=re.compile(r'destination|port|location|to|next', re.I)) + \
+           soup.find_all(attrs={'data-destination': True}) + \
+           soup.find_all(attrs={'data-port': True}) + \
+           soup.find_all(attrs={'data-location': True})
+
+def check(label, result, reference, expected):
+    """Print and return whether result matches both the ordered search and the expected value"""
+    if result == reference == expected:
+        print(f"✓ {label}: {result!r}")
+        return True
+    print(f"✗ {label}: got {result!r}, ordered search {reference!r}, expected {expected!r}")
+    return False
+
+def test_destination_patterns():
+    """Test the destination scan against the ordered search"""
+    print("=" * 60)
+    print("TEST 1: Destination patterns")
+    print("=" * 60)
+    accept = place_accept(_DESTINATION_PREFIX_RE)
+    results = [check(repr(text[:40]),
+                     find_place_text(_DESTINATION_SCAN_RE, text, _DESTINATION_PREFIX_RE),
+                     ordered_search(_DESTINATION_PATTERNS, text, accept),
+                     expected)
+               for text, expected in DESTINATION_SAMPLES]
+    return all(results)
+
+def test_origin_patterns():
+    """Test the origin scan against the ordered search"""
+    print("\n" + "=" * 60)
+    print("TEST 2: Origin patterns")
+    print("=" * 60)
+    accept = place_accept(_ORIGIN_PREFIX_RE)
+    results = [check(repr(text[:40]),
+                     find_place_text(_ORIGIN_SCAN_RE, text, _ORIGIN_PREFIX_RE),
+                     ordered_search(_ORIGIN_PATTERNS, text, accept),
+                     expected)
+               for text, expected in ORIGIN_SAMPLES]
+    return all(results)
+
+def test_search_and_dms_patterns():
+    """Test the first-match scans (search page destination, DMS values) against the ordered search"""
+    print("\n" + "=" * 60)
+    print("TEST 3: Search page destination and DMS patterns")
+    print("=" * 60)
+    results = []
+    for text, expected in SEARCH_SAMPLES:
+        results.append(check(repr(text[:40]),
+                             find_first_match(_SEARCH_DESTINATION_SCAN_RE, text),
+                             ordered_search(_SEARCH_DESTINATION_PATTERNS, text),
+                             expected))
+    for text, expected_lat, expected_lon in DMS_SAMPLES:
+        results.append(check(f"latitude in {text!r}",
+                             find_first_match(_DMS_LAT_SCAN_RE, text),
+                             ordered_search(_DMS_LAT_PATTERNS, text),
+                             expected_lat))
+        results.append(check(f"longitude in {text!r}",
+                             find_first_match(_DMS_LON_SCAN_RE, text),
+                             ordered_search(_DMS_LON_PATTERNS, text),
+                             expected_lon))
+    return all(results)
+
+def test_overlapping_patterns():
+    """Test a lower-priority pattern whose first match starts where a rejected higher-priority one does"""
+    print("\n" + "=" * 60)
+    print("TEST 4: Patterns matching at the same position")
+    print("=" * 60)
+    patterns = (r'Destination[:\s]+([^\n\r]+)', r'Destination[:\s]+(\w+)')
+    pattern_set = compile_pattern_set(patterns)
+    text = "Destination: latest AIS Satellite data\nDestination: Valparaiso"
+    accept = place_accept(_DESTINATION_PREFIX_RE)
+    return check(repr(text[:40]),
+                 find_place_text(pattern_set, text, _DESTINATION_PREFIX_RE),
+                 ordered_search(patterns, text, accept),
+                 "latest")
+
+def test_script_fields():
+    """Test the script destination/coordinate lookup against scanning every script in order"""
+    print("\n" + "=" * 60)
+    print("TEST 5: JSON/JavaScript script fields")
+    print("=" * 60)
+    results = [check(f"{len(script_texts)} scripts",
+                     extract_script_fields(script_texts),
+                     ordered_script_fields(script_texts),
+                     expected)
+               for script_texts, expected in SCRIPT_SAMPLES]
+    return all(results)
+
+def test_destination_elements():
+    """Test the destination element lookup keeps class matches ahead of data attributes"""
+    print("\n" + "=" * 60)
+    print("TEST 6: Destination element priority")
+    print("=" * 60)
+    results = []
+    for html, expected in ELEMENT_SAMPLES:
+        soup = BeautifulSoup(html, 'lxml')
+        first = next(select_destination_elements(soup), None)
+        reference = ordered_elements(soup)
+        results.append(check(repr(html[:40]),
+                             first.get_text(strip=True) if first else None,
+                             reference[0].get_text(strip=True) if reference else None,
+                             expected))
+    return all(results)
+
+def main():
+    """Run all tests"""
+    results = []
+    results.append(("Destination patterns", test_destination_patterns()))
+    results.append(("Origin patterns", test_origin_patterns()))
+    results.append(("Search page and DMS patterns", test_search_and_dms_patterns()))
+    results.append(("Overlapping patterns", test_overlapping_patterns()))
+    results.append(("Script fields", test_script_fields()))
+    results.append(("Destination elements", test_destination_elements()))
+    
+    print("\n" + "=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+    for test_name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"{status}: {test_name}")
+    
+    return all(result[1] for result in results)
+
+if __name__ == '__main__':
+    exit(0 if main() else 1)